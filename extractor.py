@@ -6,8 +6,11 @@ import os
 from xml.etree import ElementTree as ET
 import pandas as pd
 import re
+from functools import partial
 from typing import Dict, List
 
+from pipeline import PipelinedIO
+
 
 class XMLParagraphExtractor:
     """
@@ -62,9 +65,32 @@ class XMLParagraphExtractor:
         Returns:
             DataFrame containing extracted paragraphs and metadata
         """
+        return self.parse_xml(self.read_xml(fname), fname)
+
+    def read_xml(self, fname: str) -> str:
+        """
+        Read the contents of a PAGE XML file.
+        
+        Args:
+            fname: Path to the XML file
+            
+        Returns:
+            XML document as a string
+        """
         with open(fname, 'r', encoding='utf-8') as f:
-            data = f.read()
+            return f.read()
 
+    def parse_xml(self, data: str, fname: str) -> pd.DataFrame:
+        """
+        Extract text paragraphs from the contents of a PAGE XML file.
+        
+        Args:
+            data: XML document as a string
+            fname: Path to the XML file (used in error messages)
+            
+        Returns:
+            DataFrame containing extracted paragraphs and metadata
+        """
         root = ET.fromstring(data)
         
         content_keys = [
@@ -125,7 +151,8 @@ class XMLParagraphExtractor:
 
         return pd.DataFrame(contents)
 
-    def extract_all(self, xml_dir: str, output_dir: str, verbose: bool = True) -> List[str]:
+    def extract_all(self, xml_dir: str, output_dir: str, verbose: bool = True,
+                    read_ahead: int = 0, write_depth: int = 0) -> List[str]:
         """
         Extract all XML files in the specified directory.
         
@@ -133,6 +160,9 @@ class XMLParagraphExtractor:
             xml_dir: Directory containing XML files
             output_dir: Directory to save CSV outputs
             verbose: Whether to print progress messages
+            read_ahead: Number of XML files to prefetch (0 = sequential reads)
+            write_depth: Number of CSV files queued for the background writer
+                (0 = sequential writes)
             
         Returns:
             List of paths to created CSV files
@@ -156,21 +186,41 @@ class XMLParagraphExtractor:
             print(f"Found {len(xml_files)} XML files to process")
 
         csv_files = []
-        for fname in xml_files:
-            try:
-                data = self.extract_xml(fname)
-
-                # Save CSV in the output directory
-                csv_filename = os.path.join(output_dir, os.path.basename(fname).replace('.xml', '.csv'))
-                data.to_csv(csv_filename, index=False, encoding='utf-8-sig')
-
-                csv_files.append(csv_filename)
-                
-                if verbose:
-                    print(f'✓ Extracted: {os.path.basename(csv_filename)}')
-
-            except Exception as e:
-                if verbose:
-                    print(f'✗ Error processing {os.path.basename(fname)}: {e}')
+
+        def on_written(csv_filename):
+            csv_files.append(csv_filename)
+            if verbose:
+                print(f'✓ Extracted: {os.path.basename(csv_filename)}')
+
+        def on_error(csv_filename, e):
+            if verbose:
+                print(f'✗ Error writing {os.path.basename(csv_filename)}: {e}')
+
+        try:
+            with PipelinedIO(read_ahead, write_depth) as pipe:
+                for fname, data, error in pipe.read(xml_files, self.read_xml):
+                    try:
+                        if error:
+                            raise error
+                        data = self.parse_xml(data, fname)
+
+                        # Save CSV in the output directory
+                        csv_filename = os.path.join(output_dir, os.path.basename(fname).replace('.xml', '.csv'))
+                        pipe.write(
+                            csv_filename,
+                            partial(data.to_csv, csv_filename, index=False, encoding='utf-8-sig'),
+                            on_written, on_error
+                        )
+
+                    except Exception as e:
+                        if verbose:
+                            print(f'✗ Error processing {os.path.basename(fname)}: {e}')
+        except RuntimeError as e:
+            # A write callback failed on the background writer
+            if verbose:
+                print(f'✗ {e}')
+
+        if verbose:
+            print(f'  I/O: {pipe.summary()}')
 
         return csv_files
@@ -1,13 +1,29 @@
 """
 CSV Merge Module
-Merges multiple CSV files into a single file
+Merges multiple CSV files into a single file, and optionally maintains an
+incrementally updated SQLite database with a full-text (FTS5) index
 """
+import hashlib
+import io
 import os
+import sqlite3
 import pandas as pd
 from typing import List
 
+from pipeline import PipelinedIO
 
-def merge_csv_files(input_dir: str, output_file: str, verbose: bool = True) -> str:
+# Columns stored in the SQLite pages table (in merged CSV order)
+PAGE_COLUMNS = [
+    'paragraph', 'normalised_paragraph', 'paragraph_idx', 'readingorder_idx',
+    'region_type', 'filename', 'newspaper', 'year', 'month', 'date', 'page_num'
+]
+
+# Columns stored as integers so range filters and sorting compare numbers
+INTEGER_COLUMNS = ['readingorder_idx', 'year', 'month', 'date', 'page_num']
+
+
+def merge_csv_files(input_dir: str, output_file: str, verbose: bool = True,
+                    read_ahead: int = 0) -> str:
     """
     Merge all CSV files in the specified input directory.
     
@@ -15,6 +31,7 @@ def merge_csv_files(input_dir: str, output_file: str, verbose: bool = True) -> s
         input_dir: Directory containing CSV files to merge
         output_file: Path to save the merged CSV file
         verbose: Whether to print progress messages
+        read_ahead: Number of CSV files to prefetch (0 = sequential reads)
         
     Returns:
         Path to the merged CSV file, or None if merge failed
@@ -52,15 +69,18 @@ def merge_csv_files(input_dir: str, output_file: str, verbose: bool = True) -> s
         print(f"Found {len(all_files)} CSV files to merge")
 
     df_list = []
-    for file in all_files:
-        try:
-            df = pd.read_csv(file)
+    with PipelinedIO(read_ahead) as pipe:
+        for file, df, error in pipe.read(all_files, pd.read_csv):
+            if error:
+                if verbose:
+                    print(f"  ✗ Error reading {os.path.basename(file)}: {error}")
+                continue
             df_list.append(df)
             if verbose:
                 print(f"  ✓ Read: {os.path.basename(file)} ({len(df)} rows)")
-        except Exception as e:
-            if verbose:
-                print(f"  ✗ Error reading {os.path.basename(file)}: {e}")
+
+    if verbose:
+        print(f"  I/O: {pipe.summary()}")
 
     if df_list:
         merged_df = pd.concat(df_list, ignore_index=True)
@@ -75,3 +95,234 @@ def merge_csv_files(input_dir: str, output_file: str, verbose: bool = True) -> s
         if verbose:
             print("✗ No valid CSV files to merge.")
         return None
+
+
+def _init_sqlite(conn: sqlite3.Connection, fts_tokenizer: str):
+    """
+    Create the tables, metadata indexes and FTS5 index if they do not exist.
+
+    The FTS5 table is an external-content index over the pages table and is
+    kept in sync by triggers, so inserts and deletes on pages are all that is
+    needed to update it.
+
+    Args:
+        conn: Open SQLite connection
+        fts_tokenizer: FTS5 tokenizer used when the index is first created
+    """
+    columns = ',\n            '.join(
+        f'{col} INTEGER' if col in INTEGER_COLUMNS else f'{col} TEXT'
+        for col in PAGE_COLUMNS
+    )
+    new_values = ', '.join(f'new.{col}' for col in ('paragraph', 'normalised_paragraph'))
+    old_values = ', '.join(f'old.{col}' for col in ('paragraph', 'normalised_paragraph'))
+
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS source_files (
+            name TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS pages (
+            id INTEGER PRIMARY KEY,
+            source_file TEXT NOT NULL,
+            {columns}
+        );
+        CREATE INDEX IF NOT EXISTS idx_pages_source_file ON pages (source_file);
+        CREATE INDEX IF NOT EXISTS idx_pages_date ON pages (newspaper, year, month, date, page_num);
+        CREATE INDEX IF NOT EXISTS idx_pages_filename ON pages (filename);
+        CREATE INDEX IF NOT EXISTS idx_pages_region_type ON pages (region_type);
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+            paragraph, normalised_paragraph,
+            content='pages', content_rowid='id', tokenize='{fts_tokenizer}'
+        );
+        CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
+            INSERT INTO pages_fts (rowid, paragraph, normalised_paragraph)
+            VALUES (new.id, {new_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS pages_ad AFTER DELETE ON pages BEGIN
+            INSERT INTO pages_fts (pages_fts, rowid, paragraph, normalised_paragraph)
+            VALUES ('delete', old.id, {old_values});
+        END;
+        CREATE TRIGGER IF NOT EXISTS pages_au AFTER UPDATE ON pages BEGIN
+            INSERT INTO pages_fts (pages_fts, rowid, paragraph, normalised_paragraph)
+            VALUES ('delete', old.id, {old_values});
+            INSERT INTO pages_fts (rowid, paragraph, normalised_paragraph)
+            VALUES (new.id, {new_values});
+        END;
+    """)
+
+
+def _page_rows(df: pd.DataFrame, source_file: str) -> List[tuple]:
+    """
+    Convert a page DataFrame into rows for the pages table.
+
+    Values are read as strings; SQLite's column affinity converts the
+    INTEGER_COLUMNS (reading order and date/page metadata) back to integers.
+    Missing columns are stored as NULL
+    so that CSVs from earlier steps (e.g. without normalised_paragraph) can
+    still be indexed.
+
+    Args:
+        df: DataFrame read from a page CSV
+        source_file: Name of the CSV file the rows came from
+
+    Returns:
+        List of row tuples in (source_file, *PAGE_COLUMNS) order
+    """
+    df = df.reindex(columns=PAGE_COLUMNS)
+    df = df.astype(object).where(df.notna(), None)
+    return [(source_file,) + values for values in df.itertuples(index=False, name=None)]
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def merge_to_sqlite(input_dir: str, db_file: str, verbose: bool = True,
+                    fts_tokenizer: str = 'trigram', read_ahead: int = 0) -> str:
+    """
+    Incrementally merge all CSV files in the input directory into a SQLite database.
+
+    Each CSV is tracked by a SHA-256 hash of its contents, so files rewritten
+    with identical contents (as every run of the normalization step does) are
+    skipped, new or re-normalized files have their rows replaced, and files that
+    were removed from the input directory are dropped from the database. Every
+    file is written in a single transaction using bulk inserts.
+
+    The database contains a `pages` table with indexed page metadata and a
+    `pages_fts` FTS5 index over `paragraph` and `normalised_paragraph`.
+    The default trigram tokenizer supports substring queries of three or more
+    characters, matching how the merged CSV is usually filtered.
+
+    Args:
+        input_dir: Directory containing CSV files to merge
+        db_file: Path to the SQLite database (created if it does not exist)
+        verbose: Whether to print progress messages
+        fts_tokenizer: FTS5 tokenizer used when the index is first created
+        read_ahead: Number of CSV files to prefetch (0 = sequential reads)
+
+    Returns:
+        Path to the SQLite database, or None if merge failed
+    """
+    input_dir = os.path.abspath(input_dir)
+    db_file = os.path.abspath(db_file)
+
+    if verbose:
+        print(f"\nIndexing CSV files from: {input_dir}")
+        print(f"SQLite database: {db_file}")
+
+    if not os.path.exists(input_dir):
+        if verbose:
+            print(f"✗ Error: Input folder does not exist - {input_dir}")
+        return None
+
+    os.makedirs(os.path.dirname(db_file), exist_ok=True)
+
+    csv_files = sorted(f for f in os.listdir(input_dir) if f.endswith('.csv'))
+
+    created = not os.path.exists(db_file)
+    conn = None
+    pipe = PipelinedIO(read_ahead)
+    try:
+        conn = sqlite3.connect(db_file)
+        _init_sqlite(conn, fts_tokenizer)
+        known = dict(conn.execute('SELECT name, sha256 FROM source_files'))
+
+        placeholders = ', '.join(['?'] * (len(PAGE_COLUMNS) + 1))
+        insert_sql = f"INSERT INTO pages (source_file, {', '.join(PAGE_COLUMNS)}) VALUES ({placeholders})"
+
+        current = set(csv_files)
+        updated = skipped = 0
+        paths = [os.path.join(input_dir, csv_file) for csv_file in csv_files]
+        for path, data, error in pipe.read(paths, _read_bytes):
+            csv_file = os.path.basename(path)
+            try:
+                if error:
+                    raise error
+                digest = hashlib.sha256(data).hexdigest()
+                if known.get(csv_file) == digest:
+                    skipped += 1
+                    continue
+
+                rows = _page_rows(pd.read_csv(io.BytesIO(data), dtype=str), csv_file)
+                with conn:
+                    conn.execute('DELETE FROM pages WHERE source_file = ?', (csv_file,))
+                    conn.executemany(insert_sql, rows)
+                    conn.execute(
+                        'INSERT OR REPLACE INTO source_files (name, sha256) VALUES (?, ?)',
+                        (csv_file, digest)
+                    )
+                updated += 1
+                if verbose:
+                    print(f"  ✓ Indexed: {csv_file} ({len(rows)} rows)")
+            except sqlite3.Error:
+                # Database errors (e.g. a locked database) affect every file
+                raise
+            except Exception as e:
+                if verbose:
+                    print(f"  ✗ Error indexing {csv_file}: {e}")
+
+        removed = [name for name in known if name not in current]
+        with conn:
+            for name in removed:
+                conn.execute('DELETE FROM pages WHERE source_file = ?', (name,))
+                conn.execute('DELETE FROM source_files WHERE name = ?', (name,))
+                if verbose:
+                    print(f"  ✓ Removed: {name}")
+
+        total = conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+    except sqlite3.Error as e:
+        if verbose:
+            print(f"✗ Error: Could not update SQLite database - {e}")
+        # Don't leave a partially created database behind
+        if created:
+            if conn is not None:
+                conn.close()
+                conn = None
+            if os.path.exists(db_file):
+                os.remove(db_file)
+        return None
+    finally:
+        if conn is not None:
+            conn.close()
+
+    if verbose:
+        print(f"\n✓ SQLite index up to date: {updated} updated, {skipped} unchanged, {len(removed)} removed")
+        print(f"  Total rows: {total}")
+        print(f"  I/O: {pipe.summary()}")
+
+    return db_file
+
+
+def search_sqlite(db_file: str, query: str, limit: int = 100) -> pd.DataFrame:
+    """
+    Run a full-text query against a database built by merge_to_sqlite.
+
+    The query uses FTS5 syntax and can be restricted to one column,
+    e.g. 'normalised_paragraph: "བོད་ཀྱི"'.
+
+    Args:
+        db_file: Path to the SQLite database
+        query: FTS5 match expression
+        limit: Maximum number of rows to return
+
+    Returns:
+        DataFrame of matching pages, best matches first
+    """
+    conn = sqlite3.connect(db_file)
+    try:
+        return pd.read_sql_query(
+            f"""
+            SELECT {', '.join('p.' + col for col in PAGE_COLUMNS)}
+            FROM pages_fts
+            JOIN pages p ON p.id = pages_fts.rowid
+            WHERE pages_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            conn,
+            params=(query, limit)
+        )
+    finally:
+        conn.close()
@@ -5,9 +5,14 @@ Applies normalization rules to Tibetan text using replacement tables
 import glob
 import os
 import pandas as pd
+import random
 import re
+import time
+from functools import partial
 from typing import Dict, List
 
+from pipeline import PipelinedIO
+
 
 def load_tables(table_path: str, flag: int, verbose: bool = True) -> Dict[str, pd.DataFrame]:
     """
@@ -46,13 +51,95 @@ def load_tables(table_path: str, flag: int, verbose: bool = True) -> Dict[str, p
     return tables
 
 
-def norm_text(text, tables: Dict[str, pd.DataFrame]) -> str:
+# Tables applied as plain (or, for table2, regex) replacements, in this order.
+# table3 is applied afterwards with its exception rules.
+REPLACEMENT_TABLES = ['abbreviations', 'table1', 'table2']
+
+
+def compile_rules(tables: Dict[str, pd.DataFrame]) -> Dict[str, list]:
+    """
+    Precompile normalization tables into rule lists used by norm_text.
+    
+    Every rule keeps the row index of its table entry as rule id and, for
+    literal rules, the set of characters it needs. norm_text uses that set to
+    skip rules whose characters do not all occur in the paragraph.
+    
+    Args:
+        tables: Dictionary of normalization tables
+        
+    Returns:
+        Dictionary where keys are table names and values are lists of rule tuples
+    """
+    rules = {}
+
+    for table_name in REPLACEMENT_TABLES:
+        if table_name not in tables:
+            continue
+
+        table = tables[table_name]
+        # Duplicate transcriptions behave like a dict: first position, last value
+        first_rows = {}
+        for idx, key in zip(table.index, table['transcription']):
+            first_rows.setdefault(key, idx)
+        mapping = table.set_index('transcription')['normalisation'].to_dict()
+
+        if table_name == 'table2':
+            # Regex rules have no character index and are always tried
+            rules[table_name] = [
+                (first_rows[key], key, re.compile(key), value, None)
+                for key, value in mapping.items()
+            ]
+        else:
+            rules[table_name] = [
+                (first_rows[key], key, key, value, frozenset(key))
+                for key, value in mapping.items()
+            ]
+
+    if 'table3' in tables:
+        rules['table3'] = [
+            (idx, row.transcription, row.normalisation, re.compile(row.exception),
+             row.exc_len, row.scope, frozenset(row.transcription))
+            for idx, row in zip(tables['table3'].index, tables['table3'].itertuples(index=False))
+        ]
+
+    return rules
+
+
+def new_rule_stats() -> Dict:
+    """
+    Create an empty statistics container for norm_text.
+    
+    Returns:
+        Dictionary with paragraph count, per-rule [hits, seconds] keyed by
+        (table_name, rule_id), and per-table [changed paragraphs, seconds]
+    """
+    return {'paragraphs': 0, 'rules': {}, 'tables': {}}
+
+
+def _record_rule(stats: Dict, table_name: str, rule_id, hit: bool, elapsed: float):
+    entry = stats['rules'].setdefault((table_name, rule_id), [0, 0.0])
+    entry[0] += hit
+    entry[1] += elapsed
+
+
+def _record_table(stats: Dict, table_name: str, changed: bool, elapsed: float):
+    entry = stats['tables'].setdefault(table_name, [0, 0.0])
+    entry[0] += changed
+    entry[1] += elapsed
+
+
+def norm_text(text, tables: Dict[str, pd.DataFrame], rules: Dict[str, list] = None,
+              stats: Dict = None) -> str:
     """
     Apply all normalization steps sequentially to a single text string.
     
     Args:
         text: Input text string
         tables: Dictionary of normalization tables
+        rules: Rules precompiled from tables with compile_rules (compiled on
+            every call if not given)
+        stats: Optional container from new_rule_stats to record rule hits,
+            timings and per-table change counts in
         
     Returns:
         Normalized text string
@@ -60,79 +147,244 @@ def norm_text(text, tables: Dict[str, pd.DataFrame]) -> str:
     if not isinstance(text, str):
         return text  # Ensure NaN or other types are not processed
 
-    def apply_replacements(text: str, table_name: str) -> str:
-        """
-        Generic function to apply replacements using a given normalization table.
-        
-        Args:
-            text: Input text
-            table_name: Name of the table to use
-            
-        Returns:
-            Text with replacements applied
-        """
-        if table_name not in tables:
-            return text
-        
-        table = tables[table_name].set_index('transcription')['normalisation'].to_dict()
-        
-        for key, value in table.items():
-            if table_name == 'table2':
+    if rules is None:
+        rules = compile_rules(tables)
+    if stats is not None:
+        stats['paragraphs'] += 1
+
+    # Superset of the characters in text: replacements only add characters,
+    # so a literal rule can be skipped if any of its characters is missing
+    chars = set(text)
+
+    # Apply normalisations in sequence
+    for table_name in REPLACEMENT_TABLES:
+        if table_name not in rules:
+            continue
+
+        table_start = time.perf_counter()
+        table_input = text
+
+        for rule_id, key, pattern, value, required in rules[table_name]:
+            if stats is not None:
+                start = time.perf_counter()
+
+            if required is None:
                 # Use regex replacement for table2
-                text = re.sub(key, value, text)
-            else:
+                text, hit = pattern.subn(value, text)
+                if hit:
+                    chars = set(text)
+            elif required <= chars and key in text:
                 # Use string replacement for other tables
                 text = text.replace(key, value)
-        
-        return text
+                chars.update(value)
+                hit = 1
+            else:
+                hit = 0
 
-    # Apply normalisations in sequence
-    text = apply_replacements(text, 'abbreviations')
-    text = apply_replacements(text, 'table1')
-    text = apply_replacements(text, 'table2')
+            if stats is not None:
+                _record_rule(stats, table_name, rule_id, hit > 0, time.perf_counter() - start)
+
+        if stats is not None:
+            _record_table(stats, table_name, text != table_input, time.perf_counter() - table_start)
 
     # Handling table3 with exceptions
-    if 'table3' in tables:
-        table3 = tables['table3']
+    if 'table3' in rules:
+        table_start = time.perf_counter()
+        table_input = text
         text_list = list(text)
         
-        for _, row in table3.iterrows():
-            transcription = row['transcription']
-            norm = row['normalisation']
-            exc = row['exception']
-            exc_len = row['exc_len']
-            scope = row['scope']
-            exception = re.compile(exc)
-
-            for i in range(len(text_list)):
-                pos_end = i + len(transcription)
-                start = max(0, i - exc_len)
-                end = min(len(text_list), pos_end + exc_len)
-                
-                # Determine the range to check based on scope
-                if scope == 'left':
-                    str_range = ''.join(text_list[start:i])
-                elif scope == 'right':
-                    str_range = ''.join(text_list[pos_end:end])
-                else:  # 'both'
-                    str_range = ''.join(text_list[start:i]) + ''.join(text_list[pos_end:end])
-                
-                # Check if exception pattern is NOT found
-                if not exception.search(str_range):
-                    if len(transcription) > 1 and text_list[i:pos_end] == list(transcription):
-                        # Multi-character replacement
-                        text_list[i:pos_end] = [norm] + [''] * (pos_end - i - 1)
-                    elif text_list[i] == transcription:
-                        # Single-character replacement
-                        text_list[i] = norm
+        for rule_id, transcription, norm, exception, exc_len, scope, required in rules['table3']:
+            if stats is not None:
+                start = time.perf_counter()
+
+            hit = 0
+            if required <= chars:
+                for i in range(len(text_list)):
+                    pos_end = i + len(transcription)
+                    start_pos = max(0, i - exc_len)
+                    end = min(len(text_list), pos_end + exc_len)
+                    
+                    # Determine the range to check based on scope
+                    if scope == 'left':
+                        str_range = ''.join(text_list[start_pos:i])
+                    elif scope == 'right':
+                        str_range = ''.join(text_list[pos_end:end])
+                    else:  # 'both'
+                        str_range = ''.join(text_list[start_pos:i]) + ''.join(text_list[pos_end:end])
+                    
+                    # Check if exception pattern is NOT found
+                    if not exception.search(str_range):
+                        if len(transcription) > 1 and text_list[i:pos_end] == list(transcription):
+                            # Multi-character replacement
+                            text_list[i:pos_end] = [norm] + [''] * (pos_end - i - 1)
+                            hit += 1
+                        elif text_list[i] == transcription:
+                            # Single-character replacement
+                            text_list[i] = norm
+                            hit += 1
+                if hit:
+                    chars.update(norm)
+
+            if stats is not None:
+                _record_rule(stats, 'table3', rule_id, hit > 0, time.perf_counter() - start)
         
         text = ''.join(text_list)
 
+        if stats is not None:
+            _record_table(stats, 'table3', text != table_input, time.perf_counter() - table_start)
+
     return text
 
 
+def write_rule_report(stats: Dict, rules: Dict[str, list], report_path: str,
+                      verbose: bool = True) -> str:
+    """
+    Write per-rule hit counts and timings collected by norm_text to a TSV report.
+    
+    Each rule row holds the table name, rule id (row index in the table file),
+    transcription, number of paragraphs the rule changed and the time spent
+    on it. Rows with rule '*' hold the per-table totals (paragraphs changed
+    by the table and time spent in it).
+    
+    Args:
+        stats: Statistics collected with new_rule_stats / norm_text
+        rules: Rules the statistics were collected with (from compile_rules)
+        report_path: Path to save the TSV report
+        verbose: Whether to print progress messages
+        
+    Returns:
+        Path to the report
+    """
+    rows = []
+    for table_name, table_rules in rules.items():
+        changed, seconds = stats['tables'].get(table_name, [0, 0.0])
+        rows.append((table_name, '*', '', changed, seconds))
+        for rule in table_rules:
+            hits, seconds = stats['rules'].get((table_name, rule[0]), [0, 0.0])
+            rows.append((table_name, rule[0], rule[1], hits, seconds))
+
+    report = pd.DataFrame(rows, columns=['table', 'rule', 'transcription', 'hits', 'seconds'])
+    report_dir = os.path.dirname(report_path)
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+    report.to_csv(report_path, sep='\t', index=False, encoding='utf-8')
+
+    if verbose:
+        print(f"\nRule coverage over {stats['paragraphs']} paragraphs:")
+        for table_name, table_rules in rules.items():
+            changed, seconds = stats['tables'].get(table_name, [0, 0.0])
+            fired = sum(1 for rule in table_rules if stats['rules'].get((table_name, rule[0]), [0])[0])
+            print(f"  {table_name}: {fired}/{len(table_rules)} rules fired, "
+                  f"{changed} paragraphs changed, {seconds:.2f}s")
+        print(f"  ✓ Rule report saved: {report_path}")
+
+    return report_path
+
+
+def prune_tables(tables: Dict[str, pd.DataFrame], report_path: str,
+                 verbose: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Drop rules that never fired according to a report from write_rule_report.
+    
+    A rule is only dropped if the report lists it with zero hits under the same
+    row index and transcription, so rules added or edited since the report
+    was written are kept.
+    
+    Args:
+        tables: Dictionary of normalization tables
+        report_path: Path to the TSV report
+        verbose: Whether to print progress messages
+        
+    Returns:
+        Dictionary of pruned normalization tables
+    """
+    report = pd.read_csv(report_path, sep='\t', dtype=str, keep_default_na=False)
+    report = report[report['rule'] != '*']
+    dead = {
+        (table_name, int(rule_id), transcription)
+        for table_name, rule_id, transcription, hits in zip(
+            report['table'], report['rule'], report['transcription'], report['hits'])
+        if int(hits) == 0
+    }
+
+    pruned = {}
+    for table_name, table in tables.items():
+        if table_name in REPLACEMENT_TABLES:
+            # Rules are identified by the first row of each transcription
+            first_rows = table['transcription'].drop_duplicates()
+            dead_keys = {
+                key for idx, key in first_rows.items()
+                if (table_name, idx, key) in dead
+            }
+            keep = ~table['transcription'].isin(dead_keys)
+        elif table_name == 'table3':
+            keep = [
+                (table_name, idx, key) not in dead
+                for idx, key in table['transcription'].items()
+            ]
+        else:
+            keep = [True] * len(table)
+
+        pruned[table_name] = table[keep]
+        if verbose:
+            print(f"  ✓ Pruned {table_name}: {len(pruned[table_name])}/{len(table)} rules kept")
+
+    return pruned
+
+
+def sample_paragraphs(input_dir: str, sample_size: int, seed: int = 0) -> List[str]:
+    """
+    Collect a random sample of paragraphs from the CSV files in a directory.
+    
+    Args:
+        input_dir: Directory containing CSV files with a 'paragraph' column
+        sample_size: Maximum number of paragraphs to return
+        seed: Random seed, so repeated runs check the same sample
+        
+    Returns:
+        List of paragraph strings
+    """
+    rng = random.Random(seed)
+    csv_files = sorted(f for f in os.listdir(input_dir) if f.endswith('.csv'))
+    rng.shuffle(csv_files)
+
+    paragraphs = []
+    for csv_file in csv_files:
+        if len(paragraphs) >= sample_size:
+            break
+        df = pd.read_csv(os.path.join(input_dir, csv_file))
+        if 'paragraph' in df.columns:
+            paragraphs.extend(text for text in df['paragraph'] if isinstance(text, str))
+
+    if len(paragraphs) > sample_size:
+        paragraphs = rng.sample(paragraphs, sample_size)
+    return paragraphs
+
+
+def verify_tables(paragraphs: List[str], tables: Dict[str, pd.DataFrame],
+                  pruned_tables: Dict[str, pd.DataFrame]) -> int:
+    """
+    Check that pruned tables normalize paragraphs exactly like the full tables.
+    
+    Args:
+        paragraphs: Paragraphs to check
+        tables: Full normalization tables
+        pruned_tables: Pruned normalization tables
+        
+    Returns:
+        Number of paragraphs with a different result
+    """
+    rules = compile_rules(tables)
+    pruned_rules = compile_rules(pruned_tables)
+    return sum(
+        norm_text(text, tables, rules) != norm_text(text, pruned_tables, pruned_rules)
+        for text in paragraphs
+    )
+
+
 def normalize_csv_files(input_dir: str, output_dir: str, tables: Dict[str, pd.DataFrame], 
-                        verbose: bool = True) -> List[str]:
+                        verbose: bool = True, read_ahead: int = 0, write_depth: int = 0,
+                        stats: Dict = None) -> List[str]:
     """
     Normalize all CSV files in the input directory.
     
@@ -141,6 +393,11 @@ def normalize_csv_files(input_dir: str, output_dir: str, tables: Dict[str, pd.Da
         output_dir: Directory to save normalized CSV files
         tables: Dictionary of normalization tables
         verbose: Whether to print progress messages
+        read_ahead: Number of CSV files to prefetch (0 = sequential reads)
+        write_depth: Number of CSV files queued for the background writer
+            (0 = sequential writes)
+        stats: Optional container from new_rule_stats to collect rule
+            statistics in (see write_rule_report)
         
     Returns:
         List of paths to normalized CSV files
@@ -160,34 +417,56 @@ def normalize_csv_files(input_dir: str, output_dir: str, tables: Dict[str, pd.Da
         print(f"\nNormalizing {len(csv_files)} CSV files...")
 
     normalized_files = []
-    
-    for csv_file in csv_files:
-        input_path = os.path.join(input_dir, csv_file)
-        output_path = os.path.join(output_dir, csv_file)
-        
-        try:
-            df = pd.read_csv(input_path)
-
-            if 'paragraph' not in df.columns:
-                if verbose:
-                    print(f"  ⚠ Skipping {csv_file}: no 'paragraph' column found")
-                continue
-
-            # Apply normalization and insert normalized column after paragraph column
-            df.insert(
-                df.columns.get_loc('paragraph') + 1, 
-                'normalised_paragraph', 
-                df['paragraph'].apply(lambda text: norm_text(text, tables))
-            )
-
-            df.to_csv(output_path, index=False, encoding='utf-8-sig')
-            normalized_files.append(output_path)
-            
-            if verbose:
-                print(f"  ✓ Normalized: {csv_file}")
+    rules = compile_rules(tables)
 
-        except Exception as e:
-            if verbose:
-                print(f"  ✗ Error normalizing {csv_file}: {e}")
+    def on_written(output_path):
+        normalized_files.append(output_path)
+        if verbose:
+            print(f"  ✓ Normalized: {os.path.basename(output_path)}")
+
+    def on_error(output_path, e):
+        if verbose:
+            print(f"  ✗ Error writing {os.path.basename(output_path)}: {e}")
+
+    def read_file(csv_file):
+        return pd.read_csv(os.path.join(input_dir, csv_file))
+
+    try:
+        with PipelinedIO(read_ahead, write_depth) as pipe:
+            for csv_file, df, error in pipe.read(csv_files, read_file):
+                output_path = os.path.join(output_dir, csv_file)
+
+                try:
+                    if error:
+                        raise error
+
+                    if 'paragraph' not in df.columns:
+                        if verbose:
+                            print(f"  ⚠ Skipping {csv_file}: no 'paragraph' column found")
+                        continue
+
+                    # Apply normalization and insert normalized column after paragraph column
+                    df.insert(
+                        df.columns.get_loc('paragraph') + 1, 
+                        'normalised_paragraph', 
+                        df['paragraph'].apply(lambda text: norm_text(text, tables, rules, stats))
+                    )
+
+                    pipe.write(
+                        output_path,
+                        partial(df.to_csv, output_path, index=False, encoding='utf-8-sig'),
+                        on_written, on_error
+                    )
+
+                except Exception as e:
+                    if verbose:
+                        print(f"  ✗ Error normalizing {csv_file}: {e}")
+    except RuntimeError as e:
+        # A write callback failed on the background writer
+        if verbose:
+            print(f"  ✗ {e}")
+
+    if verbose:
+        print(f"  I/O: {pipe.summary()}")
 
     return normalized_files
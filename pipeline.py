@@ -0,0 +1,183 @@
+"""
+Pipelined I/O Module
+Overlaps file reads and writes with the CPU-bound workflow steps
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+
+class PipelinedIO:
+    """
+    Prefetches input files on a bounded thread pool and hands output files to
+    a background writer thread, so the processing step sits in the middle.
+
+    Both sides are bounded: at most `read_ahead` files are read in advance and
+    at most `write_depth` outputs wait for the writer, after which the
+    processing step blocks (back-pressure). A depth of 0 disables that side
+    and performs the I/O synchronously, as in the original sequential workflow.
+
+    Time spent waiting on each queue is collected in `stats`:
+        read_wait:   processing step waiting for an input file
+        write_wait:  processing step blocked on a full write queue
+                     (or writing synchronously when write_depth is 0)
+        writer_idle: background writer waiting for work
+    """
+
+    def __init__(self, read_ahead: int = 0, write_depth: int = 0):
+        """
+        Initialize the PipelinedIO.
+
+        Args:
+            read_ahead: Number of input files to read in advance (0 = off)
+            write_depth: Maximum number of queued output files (0 = off)
+        """
+        self.read_ahead = max(0, read_ahead)
+        self.write_depth = max(0, write_depth)
+        self.stats = {
+            'files_read': 0, 'read_wait': 0.0,
+            'files_written': 0, 'write_wait': 0.0, 'writer_idle': 0.0
+        }
+        self._queue = None
+        self._writer = None
+        self._errors = []
+
+    def __enter__(self):
+        if self.write_depth:
+            self._queue = queue.Queue(maxsize=self.write_depth)
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """
+        Wait for all queued writes to finish and stop the writer thread.
+
+        Raises:
+            RuntimeError: If a write callback raised on the writer thread,
+                naming the output it was called for
+        """
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self._queue = None
+
+        if self._errors:
+            (name, error), others = self._errors[0], len(self._errors) - 1
+            self._errors = []
+            message = f"Error after writing {name}: {error}"
+            if others:
+                message += f" (and {others} more)"
+            raise RuntimeError(message) from error
+
+    def read(self, items: Iterable, read_fn: Callable[[Any], Any]) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        """
+        Read items in order, prefetching up to `read_ahead` of them.
+
+        Args:
+            items: Items to read (e.g. file paths)
+            read_fn: Function that reads a single item
+
+        Yields:
+            Tuples of (item, result, error); error is None if the read succeeded
+        """
+        if not self.read_ahead:
+            for item in items:
+                start = time.perf_counter()
+                try:
+                    result, error = read_fn(item), None
+                except Exception as e:
+                    result, error = None, e
+                self.stats['read_wait'] += time.perf_counter() - start
+                self.stats['files_read'] += 1
+                yield item, result, error
+            return
+
+        items = iter(items)
+        with ThreadPoolExecutor(max_workers=self.read_ahead) as pool:
+            pending = deque((item, pool.submit(read_fn, item)) for item in islice(items, self.read_ahead))
+            while pending:
+                item, future = pending.popleft()
+                start = time.perf_counter()
+                try:
+                    result, error = future.result(), None
+                except Exception as e:
+                    result, error = None, e
+                self.stats['read_wait'] += time.perf_counter() - start
+                self.stats['files_read'] += 1
+
+                # Keep the prefetch window full while the caller processes this item
+                pending.extend((nxt, pool.submit(read_fn, nxt)) for nxt in islice(items, 1))
+                yield item, result, error
+
+    def write(self, name: str, write_fn: Callable[[], Any],
+              on_success: Callable[[str], Any] = None,
+              on_error: Callable[[str, Exception], Any] = None):
+        """
+        Queue an output for the background writer, or write it directly.
+
+        Callbacks run on the writer thread when write_depth > 0. If one of
+        them raises there, the writer keeps going and the error is raised
+        from close() together with the name of the output.
+
+        Args:
+            name: Name of the output, passed to the callbacks
+            write_fn: Function without arguments that performs the write
+            on_success: Called with name after a successful write
+            on_error: Called with name and the exception if the write fails
+        """
+        task = (name, write_fn, on_success, on_error)
+        start = time.perf_counter()
+        if self._writer is not None:
+            self._queue.put(task)
+        else:
+            self._run_write(task)
+        self.stats['write_wait'] += time.perf_counter() - start
+
+    def summary(self) -> str:
+        """
+        Format the queue wait times for progress output.
+
+        Returns:
+            One-line summary of the collected stats
+        """
+        s = self.stats
+        parts = [f"read wait {s['read_wait']:.2f}s ({s['files_read']} files, read_ahead={self.read_ahead})"]
+        if s['files_written'] or self.write_depth:
+            parts.append(f"write wait {s['write_wait']:.2f}s ({s['files_written']} files, write_depth={self.write_depth})")
+        if self.write_depth:
+            parts.append(f"writer idle {s['writer_idle']:.2f}s")
+        return ', '.join(parts)
+
+    def _write_loop(self):
+        while True:
+            start = time.perf_counter()
+            task = self._queue.get()
+            self.stats['writer_idle'] += time.perf_counter() - start
+            if task is None:
+                break
+            try:
+                self._run_write(task)
+            except Exception as e:
+                # Keep draining the queue so producers never block on a dead writer
+                self._errors.append((task[0], e))
+
+    def _run_write(self, task):
+        name, write_fn, on_success, on_error = task
+        try:
+            write_fn()
+        except Exception as e:
+            if on_error:
+                on_error(name, e)
+            return
+        self.stats['files_written'] += 1
+        if on_success:
+            on_success(name)
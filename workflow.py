@@ -16,8 +16,11 @@ from datetime import datetime
 import argparse
 
 from extractor import XMLParagraphExtractor
-from normalizer import load_tables, normalize_csv_files
-from merger import merge_csv_files
+from normalizer import (
+    load_tables, normalize_csv_files, new_rule_stats, compile_rules,
+    write_rule_report, prune_tables, sample_paragraphs, verify_tables
+)
+from merger import merge_csv_files, merge_to_sqlite
 
 
 class WorkflowManager:
@@ -40,6 +43,10 @@ class WorkflowManager:
         self.config.read(config_path)
         self.verbose = self.config.getboolean('logging', 'verbose', fallback=True)
         
+        # Pipelined I/O settings (0 = sequential reads/writes)
+        self.read_ahead = self.config.getint('pipeline', 'read_ahead', fallback=0)
+        self.write_depth = self.config.getint('pipeline', 'write_queue_depth', fallback=0)
+        
         # Initialize logging
         self.log_file = self.config.get('logging', 'log_file', fallback=None)
         if self.log_file:
@@ -90,7 +97,9 @@ class WorkflowManager:
             return False
         
         extractor = XMLParagraphExtractor(namespace_uri, excluded_files)
-        csv_files = extractor.extract_all(xml_dir, output_dir, self.verbose)
+        csv_files = extractor.extract_all(
+            xml_dir, output_dir, self.verbose, self.read_ahead, self.write_depth
+        )
         
         if csv_files:
             self.log(f"\n✓ Extraction complete: {len(csv_files)} CSV files created")
@@ -135,8 +144,45 @@ class WorkflowManager:
             self.log("✗ No normalization tables loaded")
             return False
         
+        analyze_rules = self.config.getboolean('normalization', 'analyze_rules', fallback=False)
+        prune_rules = self.config.getboolean('normalization', 'prune_rules', fallback=False)
+        rule_report = self.config.get('normalization', 'rule_report', fallback='').strip()
+        
+        if analyze_rules or prune_rules:
+            if not rule_report:
+                self.log("✗ Error: rule_report must be set to analyze or prune rules")
+                return False
+        
+        # Use a pruned rule set from an earlier analysis, if it is still exact on a sample
+        if prune_rules and not analyze_rules:
+            if not os.path.exists(rule_report):
+                self.log(f"⚠ Rule report not found, using full tables: {rule_report}")
+            else:
+                pruned = prune_tables(tables, rule_report, self.verbose)
+                sample_size = self.config.getint('normalization', 'verify_sample_size', fallback=500)
+                sample = sample_paragraphs(input_dir, sample_size) if sample_size > 0 else []
+                if not sample:
+                    # An empty sample proves nothing, so never accept the pruned tables on it
+                    self.log("⚠ No sample paragraphs to verify pruned rules against, using full tables")
+                else:
+                    mismatches = verify_tables(sample, tables, pruned)
+                    if mismatches:
+                        self.log(f"⚠ Pruned rules differ on {mismatches}/{len(sample)} sample paragraphs, "
+                                 "using full tables (re-run with analyze_rules = True)")
+                    else:
+                        self.log(f"✓ Pruned rules verified on {len(sample)} sample paragraphs")
+                        tables = pruned
+        
+        stats = new_rule_stats() if analyze_rules else None
+        
         # Normalize CSV files
-        normalized_files = normalize_csv_files(input_dir, output_dir, tables, self.verbose)
+        normalized_files = normalize_csv_files(
+            input_dir, output_dir, tables, self.verbose, self.read_ahead, self.write_depth, stats
+        )
+        
+        if stats is not None:
+            write_rule_report(stats, compile_rules(tables), rule_report, self.verbose)
+            self.log(f"  Rule report: {rule_report}")
         
         if normalized_files:
             self.log(f"\n✓ Normalization complete: {len(normalized_files)} files normalized")
@@ -170,15 +216,31 @@ class WorkflowManager:
             self.log(f"✗ Error: Input directory does not exist: {input_dir}")
             return False
         
-        result = merge_csv_files(input_dir, output_file, self.verbose)
+        result = merge_csv_files(input_dir, output_file, self.verbose, self.read_ahead)
         
-        if result:
-            self.log(f"\n✓ Merge complete")
-            self.log(f"  Output file: {result}")
-            return True
-        else:
+        if not result:
             self.log("✗ Merge failed")
             return False
+        
+        self.log(f"\n✓ Merge complete")
+        self.log(f"  Output file: {result}")
+        
+        # Optionally keep the SQLite/FTS5 search index up to date. The CSV merge
+        # already succeeded, so an index failure (e.g. SQLite without FTS5 or
+        # the tokenizer) is only a warning.
+        sqlite_filename = self.config.get('merge', 'sqlite_filename', fallback='').strip()
+        if sqlite_filename:
+            fts_tokenizer = self.config.get('merge', 'fts_tokenizer', fallback='trigram').strip()
+            db_file = merge_to_sqlite(
+                input_dir, os.path.join(output_dir, sqlite_filename), self.verbose,
+                fts_tokenizer=fts_tokenizer, read_ahead=self.read_ahead
+            )
+            if db_file:
+                self.log(f"  SQLite index: {db_file}")
+            else:
+                self.log("⚠ SQLite index update failed, merged CSV is unaffected")
+        
+        return True
     
     def run_workflow(self):
         """